@@ -0,0 +1,114 @@
+'''Fast fasta record iteration.
+
+Uncompressed regular files are memory mapped and split into records by
+searching for line starting '>' characters with mmap.find, which runs in C
+over the whole mapping instead of reading line by line. Compressed files
+and other streams are read through xopen in binary mode and parsed line by
+line. xopen decompresses in a separate pigz/igzip process with
+multiple threads if available and uses python-isal for gzip in process
+decompression.
+
+All records are returned as (title, sequence) tuples of bytes. The
+sequences are upper cased and have their whitespace removed.
+'''
+import mmap
+import os
+from xopen import xopen
+
+_WHITESPACE = b' \t\r\n'
+_UPPER_TABLE = bytes.maketrans(b'abcdefghijklmnopqrstuvwxyz', b'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+# default decompression threads per compressed input file
+DECOMPRESSION_THREADS = max(1, (os.cpu_count() or 2) // 2)
+
+# magic numbers of the compression formats supported by xopen
+_COMPRESSION_MAGIC = (
+  b'\x1f\x8b',             # gzip
+  b'BZh',                  # bzip2
+  b'\xfd7zXZ\x00',         # xz
+  b'\x28\xb5\x2f\xfd',     # zstandard
+)
+
+def iter_records(filename, titles=True, threads=DECOMPRESSION_THREADS):
+  '''yields (title, sequence) tuples for all records in the file. With
+  titles=False the title is not extracted and always None. Compressed files
+  are decompressed with the given number of threads.'''
+  if _is_plain_file(filename):
+    yield from _iter_mmap_records(filename, titles)
+  else:
+    with xopen(filename, 'rb', threads=threads) as fh:
+      yield from _iter_stream_records(fh, titles)
+
+def iter_batches(filename, max_records=10000, max_bytes=4 * 1024 * 1024, threads=DECOMPRESSION_THREADS):
+  '''yields the sequences of the file in lists of at most max_records
+  sequences. A batch is also finished before it would exceed max_bytes, so a
+  very long sequence ends up in a batch of its own. threads is passed to
+  iter_records.'''
+  batch = []
+  size = 0
+  for _title, seq in iter_records(filename, titles=False, threads=threads):
+    if batch and size + len(seq) > max_bytes:
+      yield batch
+      batch = []
+      size = 0
+    batch.append(seq)
+    size = size + len(seq)
+    if len(batch) == max_records:
+      yield batch
+      batch = []
+      size = 0
+  if batch:
+    yield batch
+
+def _is_plain_file(filename):
+  if not os.path.isfile(filename):
+    return False
+  with open(filename, 'rb') as fh:
+    magic = fh.read(6)
+  return not magic.startswith(_COMPRESSION_MAGIC)
+
+def _iter_stream_records(fh, titles):
+  in_record = False
+  title = None
+  lines = []
+  for line in fh:
+    if line[:1] == b'>':
+      if in_record:
+        yield title, b''.join(lines).translate(_UPPER_TABLE, _WHITESPACE)
+      in_record = True
+      title = line[1:].rstrip() if titles else None
+      lines = []
+    elif in_record:
+      # like SimpleFastaParser, ignore everything before the first header
+      lines.append(line)
+  if in_record:
+    yield title, b''.join(lines).translate(_UPPER_TABLE, _WHITESPACE)
+
+def _iter_mmap_records(filename, titles):
+  with open(filename, 'rb') as fh:
+    size = os.fstat(fh.fileno()).st_size
+    if size == 0:
+      return
+    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      # like SimpleFastaParser, ignore everything before the first header
+      if mm[:1] == b'>':
+        start = 0
+      else:
+        start = mm.find(b'\n>')
+        if start == -1:
+          return
+        start = start + 1
+      while True:
+        header_end = mm.find(b'\n', start)
+        if header_end == -1:
+          header_end = size
+        next_start = mm.find(b'\n>', header_end)
+        end = size if next_start == -1 else next_start
+        title = mm[start + 1:header_end].rstrip() if titles else None
+        # the slice copies the record out of the mapping and translate copies
+        # it once more while upper casing and removing the whitespace
+        seq = mm[header_end:end].translate(_UPPER_TABLE, _WHITESPACE)
+        yield title, seq
+        if next_start == -1:
+          return
+        start = next_start + 1
@@ -0,0 +1,65 @@
+'''Compute kernels for the per sequence hot path.
+
+The kernels are compiled with numba if it is installed (pip install
+fastaqc[numba]). Otherwise numpy based implementations with the same
+signature are used.
+'''
+import numpy as np
+
+try:
+  from numba import njit
+  NUMBA_AVAILABLE = True
+except ImportError:
+  NUMBA_AVAILABLE = False
+
+def _numpy_batch_character_histograms(flat, lengths, code_bits):
+  '''counts the occurrences of each byte value per sequence. flat is the
+  uint8 array of all concatenated sequences, lengths the int64 array of
+  the sequence lengths and code_bits the uint32 bitmap per byte value (see
+  fastaqc.alphabet.CODE_BITS). Returns a (len(lengths), 256) int64 matrix
+  and the uint32 bitmaps of the occurring character codes per sequence.'''
+  if len(lengths) == 1:
+    counts = np.bincount(flat, minlength=256).reshape(1, 256)
+  else:
+    # one bincount over (sequence index, byte value) pairs, the keys are
+    # built in place to avoid temporaries of the batch size
+    keys = np.repeat(np.arange(0, len(lengths) * 256, 256), lengths)
+    keys += flat
+    counts = np.bincount(keys, minlength=len(lengths) * 256)
+    counts = counts.reshape(len(lengths), 256)
+  bits = np.bitwise_or.reduce(np.where(counts > 0, code_bits, 0), axis=1).astype(np.uint32)
+  return counts, bits
+
+if NUMBA_AVAILABLE:
+  @njit(cache=True)
+  def _numba_batch_character_histograms(flat, lengths, code_bits):
+    '''counts the occurrences of each byte value per sequence. flat is the
+    uint8 array of all concatenated sequences, lengths the int64 array of
+    the sequence lengths and code_bits the uint32 bitmap per byte value (see
+    fastaqc.alphabet.CODE_BITS). Returns a (len(lengths), 256) int64 matrix
+    and the uint32 bitmaps of the occurring character codes per sequence.'''
+    counts = np.zeros((lengths.shape[0], 256), dtype=np.int64)
+    bits = np.zeros(lengths.shape[0], dtype=np.uint32)
+    pos = 0
+    for r in range(lengths.shape[0]):
+      for i in range(pos, pos + lengths[r]):
+        counts[r, flat[i]] += 1
+      pos += lengths[r]
+      b = np.uint32(0)
+      for c in range(256):
+        if counts[r, c] > 0:
+          b |= code_bits[c]
+      bits[r] = b
+    return counts, bits
+
+  batch_character_histograms = _numba_batch_character_histograms
+else:
+  batch_character_histograms = _numpy_batch_character_histograms
+
+def warmup():
+  '''triggers the jit compilation (or loading from cache) of the kernels, so
+  that it is not accounted to the first sequence. The dummy sequences are
+  read-only like the np.frombuffer views of the real batches, otherwise
+  numba would compile another specialization on the first batch.'''
+  flat = np.frombuffer(bytes(16), dtype=np.uint8)
+  batch_character_histograms(flat, np.array([8, 8], dtype=np.int64), np.ones(256, dtype=np.uint32))
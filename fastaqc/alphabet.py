@@ -1,4 +1,5 @@
 from enum import Enum
+import numpy as np
 
 # source https://www.ddbj.nig.ac.jp/ddbj/code-e.html
 _dna_unamb_chars = ['A','T','G','C']
@@ -11,6 +12,35 @@ _aa_amb_chars = ['X','B','Z','J']
 _dna_special_chars = ['-'] # gap
 _rna_special_chars = _dna_special_chars
 _aa_special_chars = ['*', '-'] # stop and gap
+_other_unamb_chars = sorted(set().union(_dna_unamb_chars, _rna_unamb_chars, _aa_unamb_chars, _dna_amb_chars, _rna_amb_chars))
+_other_special_chars = sorted(set().union(_dna_special_chars, _rna_special_chars, _aa_special_chars))
+
+# Every character that is known to any alphabet gets a small integer code, all other
+# characters share one "unknown" code. A set of characters is then a bitmap with one
+# bit per code, which allows alphabet tests with integer operations.
+_known_chars = sorted(set().union(_aa_nc_unamb_chars, _other_unamb_chars, _aa_amb_chars, _other_special_chars))
+_UNKNOWN_CODE = len(_known_chars)
+assert _UNKNOWN_CODE < 32, 'Character codes must fit into a 32 bit bitmap.'
+
+# ASCII byte value -> character code
+ENCODE = np.full(256, _UNKNOWN_CODE, dtype=np.uint8)
+ENCODE[[ord(c) for c in _known_chars]] = np.arange(len(_known_chars), dtype=np.uint8)
+
+# ASCII byte value -> bitmap of its character code
+CODE_BITS = np.left_shift(np.uint32(1), ENCODE.astype(np.uint32))
+
+def _char_bits(chars):
+  '''returns the bitmap of the codes of chars'''
+  bits = 0
+  for c in chars:
+    bits = bits | (1 << int(ENCODE[ord(c)]))
+  return bits
+
+def _char_mask(chars):
+  '''returns a boolean array with 256 entries that is True at the byte values of chars'''
+  mask = np.zeros(256, dtype=bool)
+  mask[[ord(c) for c in chars]] = True
+  return mask
 
 class Alphabet(Enum):
   DNA = (_dna_unamb_chars, _dna_amb_chars, _dna_special_chars)
@@ -19,14 +49,21 @@ class Alphabet(Enum):
   AA_NC = (_aa_nc_unamb_chars, _aa_amb_chars, _aa_special_chars)
   # other contains all characters from above, but everything from the ambiguous section
   # is added to the non-ambiguous section
-  OTHER = (
-    list(set(_dna_unamb_chars + _rna_unamb_chars + _aa_unamb_chars + _dna_amb_chars + _rna_amb_chars )),
-    _aa_amb_chars,
-    list(set(_dna_special_chars + _rna_special_chars + _aa_special_chars))
-    )
+  OTHER = (_other_unamb_chars, _aa_amb_chars, _other_special_chars)
 
   def __init__(self, unambiguous_chars, ambiguous_chars, special_chars):
     self.unambiguous_chars = unambiguous_chars
     self.ambiguous_chars = ambiguous_chars
     self.special_chars = special_chars
     self.all_chars = unambiguous_chars + ambiguous_chars + special_chars
+    # character code bitmaps for alphabet tests
+    self.unambiguous_bits = _char_bits(unambiguous_chars)
+    self.ambiguous_bits = _char_bits(ambiguous_chars)
+    self.special_bits = _char_bits(special_chars)
+    self.all_bits = _char_bits(self.all_chars)
+    # byte value masks for numpy based counting
+    self.ambiguous_mask = _char_mask(ambiguous_chars)
+    self.special_mask = _char_mask(special_chars)
+    self.unknown_mask = ~_char_mask(self.all_chars)
+    for mask in (self.ambiguous_mask, self.special_mask, self.unknown_mask):
+      mask.flags.writeable = False
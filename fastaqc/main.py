@@ -2,17 +2,40 @@
 import argparse
 from argparse import RawTextHelpFormatter
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pbr.version import VersionInfo
-from Bio import SeqIO
 import itertools
+import functools
+from collections.abc import Mapping
+import math
 from prettytable import PrettyTable
 import tabulate
-from xopen import xopen
-from fastaqc.alphabet import Alphabet
+from fastaqc.alphabet import Alphabet, CODE_BITS
+from fastaqc import _kernels
+from fastaqc import _fastaio
 import pprint
+import numpy as np
 
 __version__ = VersionInfo('fastaqc').semantic_version().release_string()
 
+# exponential sequence length buckets, enough for all 64 bit lengths
+_LENGTH_BUCKETS_PER_OCTAVE = 4
+_LENGTH_BUCKETS = 64 * _LENGTH_BUCKETS_PER_OCTAVE + 1
+
+# all sequence categories (alphabet and type flags), their names are built once
+# at import. The per category counts are arrays indexed by the position of the
+# category in this tuple.
+_TYPE_FLAG_COMBINATIONS = ((), ('unambiguous',), ('ambiguous',), ('special',), ('ambiguous', 'special'))
+_CATEGORIES = tuple('{} ({})'.format(alphabet.name, ','.join(flags))
+                    for alphabet in Alphabet for flags in _TYPE_FLAG_COMBINATIONS)
+# category codes in the order of their names, as presented to the user
+_CATEGORY_ORDER = sorted(range(len(_CATEGORIES)), key=_CATEGORIES.__getitem__)
+# the character count matrices in the stats, in the order of presentation
+_CHAR_COUNT_FIELDS = ('special_char_count', 'ambiguous_char_count', 'unknown_char_count')
+_CATEGORY_CODES = {(alphabet, frozenset(flags)): code for code, (alphabet, flags) in
+                   enumerate(itertools.product(Alphabet, _TYPE_FLAG_COMBINATIONS))}
+
 def main():
     parser = argparse.ArgumentParser(description='Version ' + __version__ + '\nCheck fasta file', formatter_class=RawTextHelpFormatter)
     parser.set_defaults(func=help)
@@ -37,236 +60,335 @@ def info(args, cfg):
   if not args.fasta:
     help(args, cfg)
     return
+  _kernels.warmup()
+  # the files are independent, so they are processed in parallel
+  workers = min(len(args.fasta), os.cpu_count() or 1)
+  if workers == 1:
+    for filename in args.fasta:
+      print_stats(_process_file(filename))
+  else:
+    # the decompression threads are shared among the workers. Forked workers
+    # inherit the kernels warmed up above, with the spawn or forkserver start
+    # methods the initializer loads them from the numba cache before the first
+    # batch.
+    process_file = functools.partial(_process_file, threads=max(1, _fastaio.DECOMPRESSION_THREADS // workers))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_kernels.warmup) as executor:
+      for stats in executor.map(process_file, args.fasta):
+        print_stats(stats)
+
+def _process_file(filename, actions=(), threads=_fastaio.DECOMPRESSION_THREADS):
+  '''computes and returns the stats dictionary of one fasta file. Compressed
+  files are decompressed with the given number of threads.'''
   # Concept
   #
-  # The base method iterates through all sequences in the fasta file and applies multiple 
-  # actions on it. Each action is modelled as a function with two parameters, the sequence
-  # record and the stats-dictionary. The stats-dictionary holds the results of each action.
-  # Subsequent actions can access the results from previous actions.
+  # The base method iterates through all sequences in the fasta file in batches. The
+  # character histograms, the sets of occurring characters (as bitmap of character codes,
+  # see fastaqc.alphabet) and the sequence lengths are computed for a whole batch at once.
+  # The sequences of a batch are then classified and counted by _process_batch.
+  #
+  # Additional actions can be given. Each action is modelled as a function with three
+  # parameters, the sequence (as upper case uint8 array), the tmp-dictionary and the
+  # stats-dictionary. Subsequent actions can access the results from previous actions.
+  # The sequences are upper cased once by the parser (see fastaqc._fastaio), so actions
+  # must not convert them again.
   #
-  # Coonvetions for stats dictionary
+  # Conventions for tmp and stats dictionary
   #  * Intermediary results for only one sequence (those that will not be presented to the user)
-  #    start with an underscore.
-  checks = [
-    count, 
-    collect_lengths,
-    compute_character_distribution,
-    compute_character_positions,
-    detect_sequence_type,
-    detect_ambiguous_and_special_characters,
-    set_sequence_category_name,
-    count_sequence_types,
-    count_sequences_with_special_characters,
-    count_sequences_with_ambiguous_characters,
-    count_sequences_with_unknown_characters,
-    clear_temporary_fields
-  ]
-
-  for filename in args.fasta:
-    with xopen(filename) as fh:
-      stats = {
-        'filename': filename
-      }
-      for record in SeqIO.parse(fh, "fasta"):
-        for c in checks:
-          c(record, stats)
-      print_stats(stats)
-
-def clear_temporary_fields(record, stats):
-  for_removal = []
-  for k in stats.keys():
-    if k.startswith('_'):
-      for_removal.append(k)
-  for k in for_removal:
-    del stats[k]
+  #    are stored in the tmp-dictionary, which is cleared before every sequence. The
+  #    actions get "character_histogram", "character_bits", "type", "type_flags" and
+  #    "category_name".
+  #  * Results that are presented to the user are stored in the stats-dictionary.
+  #  * Actions access intermediary results directly, so they must be listed after the
+  #    action that computes them.
+  stats = {
+    'filename': filename,
+    'sequences': 0,
+    'type_counts': np.zeros(len(_CATEGORIES), dtype=np.int64),
+    'special_char_count': np.zeros((len(_CATEGORIES), 256), dtype=np.int64),
+    'ambiguous_char_count': np.zeros((len(_CATEGORIES), 256), dtype=np.int64),
+    'unknown_char_count': np.zeros((len(_CATEGORIES), 256), dtype=np.int64),
+    'length_histogram': np.zeros(_LENGTH_BUCKETS, dtype=np.int64),
+  }
+  tmp = {}
+  for batch in _fastaio.iter_batches(filename, threads=threads):
+    flat, lengths, histograms, character_bits = _encode_batch(batch)
+    stats['sequences'] += len(lengths)
+    stats['length_histogram'] += np.bincount(_length_buckets(lengths), minlength=_LENGTH_BUCKETS)
+    unique_bits, unique_classifications, inverse = _process_batch(histograms, character_bits, stats)
+    if actions:
+      # the per sequence views are only materialized for the actions
+      seqs = np.split(flat, np.cumsum(lengths[:-1]))
+      for seq, histogram, i in zip(seqs, histograms, inverse.tolist()):
+        _run_actions(actions, seq, histogram, unique_bits[i], unique_classifications[i], tmp, stats)
+  return stats
+
+def _process_batch(histograms, character_bits, stats):
+  '''classifies and counts all sequences of a batch. Sequences with the same
+  character bitmap share their classification, so every distinct bitmap is
+  classified once and the type counts of the batch are one bincount. The
+  character counts are summed per distinct bitmap with one reduceat over the
+  histogram matrix. Returns the distinct bitmaps (as ints), their
+  classifications and the index of the distinct bitmap of each sequence.'''
+  unique_bits, inverse = np.unique(character_bits, return_inverse=True)
+  unique_bits = unique_bits.tolist()
+  unique_classifications = [_classify(b) for b in unique_bits]
+  group_sizes = np.bincount(inverse)
+  categories = [category for _alphabet, _type_flags, category in unique_classifications]
+  np.add.at(stats['type_counts'], categories, group_sizes)
+  if any(map(_needs_character_counts, unique_bits, unique_classifications)):
+    # number of sequences per distinct bitmap that contain a character
+    order = np.argsort(inverse, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(group_sizes[:-1])))
+    sequence_counts = np.add.reduceat(histograms[order] > 0, starts, axis=0, dtype=np.int64)
+    for counts, b, classification in zip(sequence_counts, unique_bits, unique_classifications):
+      _count_characters(counts, b, classification, stats)
+  return unique_bits, unique_classifications, inverse
+
+def _needs_character_counts(bits, classification):
+  '''checks if a sequence with the character bitmap bits contains
+  special, ambiguous or unknown characters of its alphabet'''
+  alphabet = classification[0]
+  return _contains(bits, alphabet.special_bits | alphabet.ambiguous_bits) or not _contains_only(bits, alphabet.all_bits)
+
+def _count_characters(sequence_counts, bits, classification, stats):
+  '''counts the sequences with special, ambiguous and unknown characters
+  (depending on the alphabet) of a group of sequences with the same character
+  bitmap. sequence_counts holds the number of sequences of the group that
+  contain a character, indexed by its byte value. The character counts are
+  stored in "<kind>_char_count" as (category, byte value) matrices.'''
+  alphabet, _type_flags, category = classification
+  if _contains(bits, alphabet.special_bits):
+    _count(stats, 'special_char_count', category, sequence_counts, alphabet.special_mask)
+  if _contains(bits, alphabet.ambiguous_bits):
+    _count(stats, 'ambiguous_char_count', category, sequence_counts, alphabet.ambiguous_mask)
+  if not _contains_only(bits, alphabet.all_bits):
+    _count(stats, 'unknown_char_count', category, sequence_counts, alphabet.unknown_mask)
+
+def _run_actions(actions, seq, histogram, bits, classification, tmp, stats):
+  '''runs the actions on one sequence. tmp is reused for all sequences, it is
+  cleared and filled with the intermediary results of the sequence.'''
+  tmp.clear()
+  tmp['character_histogram'] = histogram
+  tmp['character_bits'] = bits
+  tmp['type'], tmp['type_flags'], category = classification
+  tmp['category_name'] = _CATEGORIES[category]
+  for action in actions:
+    action(seq, tmp, stats)
+
+def _encode_batch(batch):
+  '''concatenates a batch of sequences (bytes) and computes the character
+  histograms and character code bitmaps of all of them with one kernel call.
+  Returns the concatenated sequences as uint8 array, the sequence lengths, the
+  (len(batch), 256) histogram matrix and the character code bitmaps of the
+  sequences.'''
+  lengths = np.fromiter(map(len, batch), dtype=np.int64, count=len(batch))
+  flat = np.frombuffer(b''.join(batch), dtype=np.uint8)
+  histograms, character_bits = _kernels.batch_character_histograms(flat, lengths, CODE_BITS)
+  return flat, lengths, histograms, character_bits
 
 def print_stats(stats):
   header = [stats['filename'], 'count']
   table = []
   table.append(['sequences', stats['sequences']])
-  logging.info(pprint.pformat(stats))
-  for k,v in sorted(stats['type_counts'].items()):
-    table.append(['   ' + k, v])
-    if 'special_char_count' in stats:
-      if k in stats['special_char_count']:
-        for k2,v2 in sorted(stats['special_char_count'][k].items()):
-          table.append(['      ' + k2,v2])
-    if 'ambiguous_char_count' in stats:
-      if k in stats['ambiguous_char_count']:
-        for k2,v2 in sorted(stats['ambiguous_char_count'][k].items()):
-          table.append(['      ' + k2,v2])
-    if 'unknown_char_count' in stats:
-      if k in stats['unknown_char_count']:
-        for k2,v2 in sorted(stats['unknown_char_count'][k].items()):
-          table.append(['      ' + k2,v2])
+  named = _named_counts(stats)
+  if logging.getLogger().isEnabledFor(logging.INFO):
+    logging.info(pprint.pformat(named, sort_dicts=False))
+  for name, count in named['type_counts'].items():
+    table.append(['   ' + name, count])
+    for field in _CHAR_COUNT_FIELDS:
+      for c, char_count in named[field].get(name, {}).items():
+        table.append(['      ' + c, char_count])
 
   tabulate.PRESERVE_WHITESPACE = True
-  print(tabulate.tabulate(table, headers=header, tablefmt='pretty', colalign=('left', 'right')))
-  if merge(stats['unknown_char_count']):
-    print("WARNING: The file contains unknown characters for DNA, RNA and AA sequences. ")
-    print("         It will probably fail in applications with strict alphabet checking.")
+  # the report of a file is written with one print call
+  lines = [tabulate.tabulate(table, headers=header, tablefmt='pretty', colalign=('left', 'right'))]
+  if stats['unknown_char_count'].any():
+    lines.append("WARNING: The file contains unknown characters for DNA, RNA and AA sequences. ")
+    lines.append("         It will probably fail in applications with strict alphabet checking.")
 
-  if 'seq_lenghts' in stats:
+  if stats['length_histogram'].any():
     import plotille
-    print('')
-    print('Sequence length distribution')
-    print(plotille.histogram(stats['seq_lenghts'], height=25, x_min=0))
-  print('')
-
-def merge(dict_of_dicts):
-  merged = {}
-  for name, subdict in dict_of_dicts.items():
-    for k,v in subdict.items():
-      if k not in merged:
-        merged[k] = v
-      else:
-        merged[k] = merged[k] + v
-  return merged
-
-def count(record, stats):
-  '''counts the number of processed sequences in the field "sequences".'''
-  if 'sequences' not in stats:
-    stats['sequences'] = 0
-  stats['sequences'] = stats['sequences'] + 1
-
-def compute_character_distribution(record, stats):
-  distribution = {}
-  for c in record.seq.upper():
-    if c not in distribution:
-      distribution[c] = 0
-    distribution[c] = distribution[c] + 1
-
-  stats['_character_distribution'] = distribution
-
-def compute_character_positions(record, stats):
-  '''computes a dictionary with all positions per character of the current 
-  sequence and stores it in "_character_positions"'''
-  positions = {}
-  for i, c in enumerate(record.seq.upper()):
-    if c not in positions:
-      positions[c] = []
-    positions[c].append(i)
-  stats['_character_positions'] = positions
-
-def count_sequences_with_special_characters(record, stats):
-  '''counts the sequences with special characters (depends on the alphabet)
-  and stores them in "special_char_count.<sequence_category>.<character>"'''
-  alphabet = assert_sequence_type_available(stats)
-  _count(stats, 'special_char_count', alphabet.special_chars)
-
-def count_sequences_with_ambiguous_characters(record, stats):
-  '''counts the sequences with ambiguous characters (depends on the alphabet)
-  and stores them in "ambiguous_char_count.<sequence_category>.<character>"'''
-  alphabet = assert_sequence_type_available(stats)
-  _count(stats, 'ambiguous_char_count', alphabet.ambiguous_chars)
-
-def _count(stats, fieldname, chars):
-  category_name = assert_sequence_category_name_available(stats)
-  c_dist = assert_character_distribution_available(stats)
-  if fieldname not in stats:
-    stats[fieldname] = {}
-  if category_name not in stats[fieldname]:
-    stats[fieldname][category_name] = {}
-  counts = stats[fieldname][category_name]
-  for c in chars:
-    if c in c_dist:
-      if c not in counts:
-        counts[c] = 0
-      counts[c] = counts[c] + 1
-
-def count_sequences_with_unknown_characters(record, stats):
-  '''counts the sequences with unknown characters (depends on the alphabet)
-  and stores them in "ambiguous_char_count.<sequence_category>.<character>"'''
-  category_name = assert_sequence_category_name_available(stats)
-  alphabet = assert_sequence_type_available(stats)
-  c_dist = assert_character_distribution_available(stats)
-  if 'unknown_char_count' not in stats:
-    stats['unknown_char_count'] = {}
-  if category_name not in stats['unknown_char_count']:
-    stats['unknown_char_count'][category_name] = {}
-  counts = stats['unknown_char_count'][category_name]
-  chars = set(alphabet.all_chars)
-  for c in c_dist.keys():
-    if c not in chars:
-      if c not in counts:
-        counts[c] = 0
-      counts[c] = counts[c] + 1
-
-def detect_sequence_type(record, stats):
-  c_dist = assert_character_distribution_available(stats)
-  if _contains_only(c_dist, Alphabet.DNA.all_chars):
-    stats['_type'] = Alphabet.DNA
-  elif _contains_only(c_dist, Alphabet.RNA.all_chars):
-    stats['_type'] = Alphabet.RNA
-  elif _contains_only(c_dist, Alphabet.AA.all_chars):
-    stats['_type'] = Alphabet.AA
-  elif _contains_only(c_dist, Alphabet.AA_NC.all_chars):
-    stats['_type'] = Alphabet.AA_NC
+    lines.append('')
+    lines.append('Sequence length distribution')
+    counts, edges = _length_histogram_buckets(stats['length_histogram'])
+    lines.append(plotille.hist_aggregated(counts, edges, width=80))
+  lines.append('')
+  print('\n'.join(lines))
+
+def _named_counts(stats):
+  '''returns the stats with the count arrays converted to dictionaries of
+  their non-zero entries, keyed by category name, character and length
+  bucket. The entries are in the order of presentation: categories by name,
+  characters and buckets ascending.'''
+  named = {
+    'filename': stats['filename'],
+    'sequences': stats['sequences'],
+    'type_counts': {},
+  }
+  for field in _CHAR_COUNT_FIELDS:
+    named[field] = {}
+  for category in _CATEGORY_ORDER:
+    if not stats['type_counts'][category]:
+      continue
+    name = _CATEGORIES[category]
+    named['type_counts'][name] = int(stats['type_counts'][category])
+    for field in _CHAR_COUNT_FIELDS:
+      counts = stats[field][category]
+      # the byte values are ascending, which is the order of the characters
+      char_counts = {_char_label(i): int(counts[i]) for i in np.flatnonzero(counts)}
+      if char_counts:
+        named[field][name] = char_counts
+  named['length_histogram'] = {'[{}, {})'.format(*_length_bucket_range(bucket)): int(stats['length_histogram'][bucket])
+                               for bucket in np.flatnonzero(stats['length_histogram'])}
+  return named
+
+def _char_label(byte_value):
+  '''returns the printable label of a byte value. Non-ASCII bytes (e.g. the
+  parts of a multi byte UTF-8 character) and ASCII control characters are
+  shown as escapes, so they are not mistaken for other characters.'''
+  if 0x20 <= byte_value < 0x7f:
+    return chr(byte_value)
+  return '\\x%02x' % byte_value
+
+def _length_histogram_buckets(length_histogram):
+  '''returns the counts and edges of the used range of the length histogram.
+  Buckets that can not contain any integer length are left out.'''
+  used = np.flatnonzero(length_histogram)
+  counts = []
+  edges = []
+  for bucket in range(used[0], used[-1] + 1):
+    lower, upper = _length_bucket_range(bucket)
+    if lower < upper:
+      counts.append(int(length_histogram[bucket]))
+      edges.append(lower)
+  edges.append(upper)
+  return counts, edges
+
+def compute_character_distribution(seq, tmp, stats):
+  '''provides the (upper case) character counts of the current sequence as
+  read-only mapping in "character_distribution". It is a view on the
+  precomputed "character_histogram", nothing is copied.'''
+  tmp['character_distribution'] = CharacterDistribution(tmp['character_histogram'])
+
+def _byte_value(c):
+  '''returns the byte value of a single character string, or None for
+  anything else'''
+  if isinstance(c, str) and len(c) == 1 and ord(c) < 256:
+    return ord(c)
+  return None
+
+class CharacterDistribution(Mapping):
+  '''read-only mapping character -> count over a 256 entry histogram indexed
+  by byte value. Only characters with a non-zero count are contained.'''
+
+  def __init__(self, histogram):
+    self.histogram = histogram
+
+  def __getitem__(self, c):
+    code = _byte_value(c)
+    if code is None or not self.histogram[code]:
+      raise KeyError(c)
+    return int(self.histogram[code])
+
+  def __contains__(self, c):
+    # direct histogram test instead of the KeyError based Mapping default
+    code = _byte_value(c)
+    return code is not None and self.histogram[code] > 0
+
+  def __iter__(self):
+    return (chr(i) for i in np.flatnonzero(self.histogram))
+
+  def __len__(self):
+    return int(np.count_nonzero(self.histogram))
+
+class CharacterPositions(CharacterDistribution):
+  '''read-only mapping character -> array of positions of the character in
+  the sequence. The positions are computed on first access per character.'''
+
+  def __init__(self, seq, histogram):
+    super().__init__(histogram)
+    self.seq = seq
+    self._positions = {}
+
+  def __getitem__(self, c):
+    if c not in self._positions:
+      super().__getitem__(c)
+      self._positions[c] = np.flatnonzero(self.seq == ord(c))
+    return self._positions[c]
+
+def compute_character_positions(seq, tmp, stats):
+  '''provides the positions per character of the current sequence as
+  read-only mapping in "character_positions". The positions of a character
+  are only computed when they are accessed.'''
+  tmp['character_positions'] = CharacterPositions(seq, tmp['character_histogram'])
+
+def _count(stats, fieldname, category, sequence_counts, mask):
+  '''adds the number of sequences that contain a character to each character
+  of mask in the row of the category. Only the characters that occur are
+  updated. The callers only invoke it for sequences that contain at least one
+  of these characters, most sequences do not need any counting.'''
+  hits = np.flatnonzero((sequence_counts > 0) & mask)
+  stats[fieldname][category, hits] += sequence_counts[hits]
+
+@functools.lru_cache(maxsize=None)
+def _classify(bits):
+  '''returns the alphabet, the type flags and the category code of a sequence
+  with the character code bitmap bits. It is memoized, because only few
+  distinct bitmaps occur, and the category is looked up in the precomputed
+  _CATEGORY_CODES instead of formatting its name.'''
+  alphabet = _detect_sequence_type(bits)
+  type_flags = _detect_ambiguous_and_special_characters(bits, alphabet)
+  category = _CATEGORY_CODES[alphabet, type_flags]
+  return alphabet, type_flags, category
+
+def _detect_sequence_type(bits):
+  if _contains_only(bits, Alphabet.DNA.all_bits):
+    return Alphabet.DNA
+  elif _contains_only(bits, Alphabet.RNA.all_bits):
+    return Alphabet.RNA
+  elif _contains_only(bits, Alphabet.AA.all_bits):
+    return Alphabet.AA
+  elif _contains_only(bits, Alphabet.AA_NC.all_bits):
+    return Alphabet.AA_NC
   else:
-    stats['_type'] = Alphabet.OTHER
+    return Alphabet.OTHER
 
-def detect_ambiguous_and_special_characters(record, stats):
-  c_dist = assert_character_distribution_available(stats)
-  alphabet = assert_sequence_type_available(stats)
+def _detect_ambiguous_and_special_characters(bits, alphabet):
   type_flags = set()
-  if _contains_only(c_dist, alphabet.unambiguous_chars):
+  if _contains_only(bits, alphabet.unambiguous_bits):
     type_flags.add('unambiguous')
   else:
-    if _contains(c_dist, alphabet.ambiguous_chars):
+    if _contains(bits, alphabet.ambiguous_bits):
       type_flags.add('ambiguous')
-    if _contains(c_dist, alphabet.special_chars):
+    if _contains(bits, alphabet.special_bits):
       type_flags.add('special')
-  stats['_type_flags'] = type_flags
-
-def set_sequence_category_name(record, stats):
-  alphabet = assert_sequence_type_available(stats)
-  flags = assert_sequence_type_flags_available(stats)
-  name = "{} ({})".format(alphabet.name, ",".join(sorted(flags)))
-  stats['_category_name'] = name
-
-def count_sequence_types(record, stats):
-  alphabet = assert_sequence_type_available(stats)
-  flags = assert_sequence_type_flags_available(stats)
-  type = assert_sequence_category_name_available(stats)
-  if 'type_counts' not in stats:
-    stats['type_counts'] = {}
-  if type not in stats['type_counts']:
-    stats['type_counts'][type] = 0
-  stats['type_counts'][type] = stats['type_counts'][type]  + 1
-
-def collect_lengths(record, stats):
-  if 'seq_lenghts' not in stats:
-    stats['seq_lenghts'] = []
-  stats['seq_lenghts'].append(len(record.seq))
-
-def _contains(dist, characters):
-  for c in characters:
-    if c in dist:
-      return True
-  return False
-
-def _contains_only(dist, characters):
-  remaining = len(dist)
-  for c in characters:
-    if c in dist:
-      remaining = remaining - 1
-  return remaining == 0
-
-def assert_character_distribution_available(stats):
-  assert '_character_distribution' in stats, 'Sequence character distribution not availabe. It must be computed before this check.'
-  return stats['_character_distribution']
-
-def assert_sequence_type_available(stats):
-  assert '_type' in stats, 'Sequence type information not availabe. It must be computed before this check.'
-  return stats['_type']
-
-def assert_sequence_type_flags_available(stats):
-  assert '_type_flags' in stats, 'Sequence type flag information not availabe. It must be computed before this check.'
-  return stats['_type_flags']
-
-def assert_sequence_category_name_available(stats):
-  assert '_category_name' in stats, 'Sequence category_name information not availabe. It must be computed before this check.'
-  return stats['_category_name']
+  return frozenset(type_flags)
+
+def _length_buckets(lengths):
+  '''returns the length buckets of an array of sequence lengths. Bucket 0
+  holds the empty sequences, the remaining buckets split each power of two
+  into _LENGTH_BUCKETS_PER_OCTAVE parts.'''
+  buckets = np.zeros(len(lengths), dtype=np.int64)
+  nonempty = lengths > 0
+  buckets[nonempty] = (np.log2(lengths[nonempty]) * _LENGTH_BUCKETS_PER_OCTAVE).astype(np.int64) + 1
+  return buckets
+
+def _length_bucket_range(bucket):
+  '''returns the smallest length of a bucket and the smallest length of the
+  next bucket'''
+  if bucket == 0:
+    return 0, 1
+  lower = math.ceil(2 ** ((bucket - 1) / _LENGTH_BUCKETS_PER_OCTAVE))
+  upper = math.ceil(2 ** (bucket / _LENGTH_BUCKETS_PER_OCTAVE))
+  return lower, upper
+
+def _contains(bits, characters):
+  '''checks if any of the characters (a code bitmap) occurs in bits (a code bitmap)'''
+  return bits & characters != 0
+
+def _contains_only(bits, characters):
+  '''checks if all of bits (a code bitmap) are in characters (a code bitmap)'''
+  return bits & ~characters == 0
 
 if __name__ == "__main__":
     main()
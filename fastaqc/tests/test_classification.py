@@ -0,0 +1,39 @@
+import unittest
+from fastaqc import main
+from fastaqc.alphabet import Alphabet, _char_bits
+
+# characters of a sequence -> expected category. The first cases were
+# misclassified while contains_only counted the duplicated RNA characters.
+CASES = {
+  'GTUY': 'AA_NC (unambiguous)',
+  'ACGU': 'RNA (unambiguous)',
+  'ACGU!': 'OTHER ()',
+  'ACGUN': 'AA_NC (unambiguous)',
+  'ACGUT': 'RNA (ambiguous)',
+  'ACGT': 'DNA (unambiguous)',
+  'ACGTN': 'DNA (ambiguous)',
+  'ACGT-': 'DNA (special)',
+  'ACGT.': 'OTHER ()',
+  'MKV*': 'AA (special)',
+  'MKVX*': 'AA (ambiguous,special)',
+  'MKVO': 'AA_NC (unambiguous)',
+}
+
+class ClassificationTest(unittest.TestCase):
+
+  def test_categories(self):
+    for chars, expected in CASES.items():
+      with self.subTest(chars):
+        _alphabet, _type_flags, category = main._classify(_char_bits(chars))
+        self.assertEqual(main._CATEGORIES[category], expected)
+
+  def test_alphabet_and_flags(self):
+    alphabet, type_flags, _category = main._classify(_char_bits('MKVX*'))
+    self.assertIs(alphabet, Alphabet.AA)
+    self.assertEqual(type_flags, frozenset(['ambiguous', 'special']))
+    alphabet, type_flags, _category = main._classify(_char_bits('ACGU!'))
+    self.assertIs(alphabet, Alphabet.OTHER)
+    self.assertEqual(type_flags, frozenset())
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,85 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from fastaqc import _fastaio
+
+try:
+  from Bio.SeqIO.FastaIO import SimpleFastaParser
+except ImportError:
+  SimpleFastaParser = None
+
+# input -> expected (title, sequence) records
+CASES = {
+  'leading junk': (b'junk\nmore\n>a desc\nacgt\nNN\n>b\nAC\n', [(b'a desc', b'ACGTNN'), (b'b', b'AC')]),
+  'crlf': (b'>a\r\nAC\r\nGT\r\n>b\r\nTT\r\n', [(b'a', b'ACGT'), (b'b', b'TT')]),
+  'trailing lone header': (b'>a\nAC\n>', [(b'a', b'AC'), (b'', b'')]),
+  'empty records': (b'>a\n>b\nAC\n>c\n', [(b'a', b''), (b'b', b'AC'), (b'c', b'')]),
+  'no trailing newline': (b'>a\nAC\nGT', [(b'a', b'ACGT')]),
+  'whitespace in sequence': (b'>a\nA C\tg\n', [(b'a', b'ACG')]),
+  'empty file': (b'', []),
+}
+
+class RecordSplitterTest(unittest.TestCase):
+  '''the mmap and the stream record splitter must agree with each other and
+  with the SimpleFastaParser semantics'''
+
+  def setUp(self):
+    self.tmpdir = tempfile.TemporaryDirectory()
+
+  def tearDown(self):
+    self.tmpdir.cleanup()
+
+  def _write(self, name, data, compress=False):
+    path = os.path.join(self.tmpdir.name, name)
+    with (gzip.open if compress else open)(path, 'wb') as fh:
+      fh.write(data)
+    return path
+
+  def test_mmap_records(self):
+    for name, (data, expected) in CASES.items():
+      with self.subTest(name):
+        path = self._write('plain.fa', data)
+        self.assertTrue(_fastaio._is_plain_file(path))
+        self.assertEqual(list(_fastaio.iter_records(path)), expected)
+
+  def test_stream_records(self):
+    for name, (data, expected) in CASES.items():
+      with self.subTest(name):
+        self.assertEqual(list(_fastaio._iter_stream_records(io.BytesIO(data), True)), expected)
+
+  def test_compressed_records(self):
+    for name, (data, expected) in CASES.items():
+      with self.subTest(name):
+        path = self._write('compressed.fa.gz', data, compress=True)
+        self.assertFalse(_fastaio._is_plain_file(path))
+        self.assertEqual(list(_fastaio.iter_records(path)), expected)
+
+  def test_without_titles(self):
+    for name, (data, expected) in CASES.items():
+      with self.subTest(name):
+        path = self._write('plain.fa', data)
+        expected = [(None, seq) for _title, seq in expected]
+        self.assertEqual(list(_fastaio.iter_records(path, titles=False)), expected)
+        self.assertEqual(list(_fastaio._iter_stream_records(io.BytesIO(data), False)), expected)
+
+  @unittest.skipUnless(SimpleFastaParser, 'biopython is not installed')
+  def test_simple_fasta_parser_semantics(self):
+    for name, (data, expected) in CASES.items():
+      with self.subTest(name):
+        records = SimpleFastaParser(io.StringIO(data.decode()))
+        converted = [(title.encode(), ''.join(seq.split()).upper().encode()) for title, seq in records]
+        self.assertEqual(converted, expected)
+
+  def test_batches(self):
+    data = b''.join(b'>%d\n%s\n' % (i, b'A' * i) for i in range(50))
+    path = self._write('plain.fa', data)
+    batches = list(_fastaio.iter_batches(path, max_records=7, max_bytes=100))
+    self.assertEqual([seq for batch in batches for seq in batch], [b'A' * i for i in range(50)])
+    for batch in batches:
+      self.assertLessEqual(len(batch), 7)
+      self.assertTrue(len(batch) == 1 or sum(map(len, batch)) <= 100)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from fastaqc import _kernels
+from fastaqc.alphabet import CODE_BITS
+
+def _batch(lengths, seed=0):
+  rng = np.random.default_rng(seed)
+  lengths = np.array(lengths, dtype=np.int64)
+  data = rng.integers(0, 256, int(lengths.sum()), dtype=np.uint8).tobytes()
+  # read-only like the batches of fastaqc.main._encode_batch
+  return np.frombuffer(data, dtype=np.uint8), lengths
+
+def _expected(flat, lengths):
+  seqs = np.split(flat, np.cumsum(lengths[:-1]))
+  counts = np.array([np.bincount(seq, minlength=256) for seq in seqs], dtype=np.int64)
+  bits = np.array([np.bitwise_or.reduce(CODE_BITS[np.unique(seq)]) if len(seq) else 0 for seq in seqs], dtype=np.uint32)
+  return counts, bits
+
+# (name, sequence lengths) including empty sequences and single sequence batches
+BATCHES = [
+  ('single', [100]),
+  ('single empty', [0]),
+  ('several', [5, 17, 1, 300]),
+  ('with empty', [0, 3, 0, 0, 12, 0]),
+]
+
+class KernelTest(unittest.TestCase):
+  '''the numba and the numpy kernel must compute the same histograms and
+  character code bitmaps'''
+
+  def _check(self, kernel):
+    for name, lengths in BATCHES:
+      with self.subTest(name):
+        flat, lengths = _batch(lengths)
+        counts, bits = kernel(flat, lengths, CODE_BITS)
+        expected_counts, expected_bits = _expected(flat, lengths)
+        np.testing.assert_array_equal(counts, expected_counts)
+        np.testing.assert_array_equal(bits, expected_bits)
+        self.assertEqual(counts.shape, (len(lengths), 256))
+        self.assertEqual(bits.dtype, np.uint32)
+
+  def test_numpy_kernel(self):
+    self._check(_kernels._numpy_batch_character_histograms)
+
+  @unittest.skipUnless(_kernels.NUMBA_AVAILABLE, 'numba is not installed')
+  def test_numba_kernel(self):
+    self._check(_kernels._numba_batch_character_histograms)
+
+  @unittest.skipUnless(_kernels.NUMBA_AVAILABLE, 'numba is not installed')
+  def test_kernels_agree(self):
+    flat, lengths = _batch(np.random.default_rng(1).integers(0, 50, 1000))
+    numba_counts, numba_bits = _kernels._numba_batch_character_histograms(flat, lengths, CODE_BITS)
+    numpy_counts, numpy_bits = _kernels._numpy_batch_character_histograms(flat, lengths, CODE_BITS)
+    np.testing.assert_array_equal(numba_counts, numpy_counts)
+    np.testing.assert_array_equal(numba_bits, numpy_bits)
+
+  def test_warmup_signature(self):
+    _kernels.warmup()
+    if _kernels.NUMBA_AVAILABLE:
+      signatures = len(_kernels.batch_character_histograms.signatures)
+      flat, lengths = _batch([4, 4])
+      _kernels.batch_character_histograms(flat, lengths, CODE_BITS)
+      self.assertEqual(len(_kernels.batch_character_histograms.signatures), signatures)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,208 @@
+import contextlib
+import functools
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from fastaqc import main
+
+FIXTURE = b'''>dna1 mixed case with N
+acgtNN
+acgt
+>dna2
+ACGT
+>dna3
+ACGTRY
+>aa1
+MKV*
+>aa2
+MKVLL*
+>other1
+ACGT.1
+>other2
+MK.
+>empty
+>dna4
+acgt
+'''
+
+TYPE_COUNTS = {
+  'AA (special)': 2,
+  'DNA (ambiguous)': 2,
+  'DNA (unambiguous)': 3,
+  'OTHER ()': 2,
+}
+
+CHAR_COUNTS = {
+  'special_char_count': {'AA (special)': {'*': 2}},
+  'ambiguous_char_count': {'DNA (ambiguous)': {'N': 1, 'R': 1, 'Y': 1}},
+  'unknown_char_count': {'OTHER ()': {'.': 2, '1': 1}},
+}
+
+# table rows in presentation order: categories by name, their special,
+# ambiguous and unknown characters ascending
+ROWS = [
+  ('sequences', 9),
+  ('AA (special)', 2),
+  ('*', 2),
+  ('DNA (ambiguous)', 2),
+  ('N', 1),
+  ('R', 1),
+  ('Y', 1),
+  ('DNA (unambiguous)', 3),
+  ('OTHER ()', 2),
+  ('.', 2),
+  ('1', 1),
+]
+
+LENGTHS = [10, 4, 6, 4, 6, 6, 3, 0, 4]
+
+class ProcessFileTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmpdir = tempfile.TemporaryDirectory()
+    self.path = os.path.join(self.tmpdir.name, 'fixture.fa')
+    with open(self.path, 'wb') as fh:
+      fh.write(FIXTURE)
+
+  def tearDown(self):
+    self.tmpdir.cleanup()
+
+  def _check_stats(self, stats):
+    self.assertEqual(stats['sequences'], len(LENGTHS))
+    type_counts = {main._CATEGORIES[code]: int(n) for code, n in enumerate(stats['type_counts']) if n}
+    self.assertEqual(type_counts, TYPE_COUNTS)
+    for field, expected in CHAR_COUNTS.items():
+      counts = np.zeros((len(main._CATEGORIES), 256), dtype=np.int64)
+      for name, chars in expected.items():
+        for c, n in chars.items():
+          counts[main._CATEGORIES.index(name), ord(c)] = n
+      np.testing.assert_array_equal(stats[field], counts, err_msg=field)
+    expected_histogram = np.bincount(main._length_buckets(np.array(LENGTHS)), minlength=main._LENGTH_BUCKETS)
+    np.testing.assert_array_equal(stats['length_histogram'], expected_histogram)
+
+  def test_process_file(self):
+    self._check_stats(main._process_file(self.path))
+
+  def test_process_file_in_small_batches(self):
+    # the counts of several batches with differently grouped bitmaps add up
+    iter_batches = functools.partial(main._fastaio.iter_batches, max_records=2)
+    with mock.patch.object(main._fastaio, 'iter_batches', iter_batches):
+      self._check_stats(main._process_file(self.path))
+
+  def test_print_stats(self):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+      main.print_stats(main._process_file(self.path))
+    rows = []
+    for line in out.getvalue().splitlines():
+      cells = [cell.strip() for cell in line.strip('|').split('|')]
+      if line.startswith('|') and len(cells) == 2 and cells[1].isdigit():
+        rows.append((cells[0], int(cells[1])))
+    self.assertEqual(rows, ROWS)
+    self.assertIn('WARNING: The file contains unknown characters', out.getvalue())
+    self.assertIn('Sequence length distribution', out.getvalue())
+
+  def test_non_ascii_characters_are_escaped(self):
+    self.assertEqual(main._char_label(ord('*')), '*')
+    self.assertEqual([main._char_label(b) for b in 'é'.encode()], ['\\xc3', '\\xa9'])
+    self.assertEqual(main._char_label(0x0b), '\\x0b')
+
+class ActionsTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmpdir = tempfile.TemporaryDirectory()
+    self.path = os.path.join(self.tmpdir.name, 'fixture.fa')
+    with open(self.path, 'wb') as fh:
+      fh.write(FIXTURE)
+    self.seen = []
+
+  def tearDown(self):
+    self.tmpdir.cleanup()
+
+  def _probe(self, seq, tmp, stats):
+    distribution = tmp['character_distribution']
+    positions = tmp['character_positions']
+    self.seen.append({
+      'keys': set(tmp),
+      'category_name': tmp['category_name'],
+      'seq': seq.tobytes(),
+      'distribution': dict(distribution),
+      'positions': {c: positions[c].tolist() for c in positions},
+    })
+    self.assertEqual(len(distribution), len(set(seq.tobytes())))
+    self.assertRaises(KeyError, distribution.__getitem__, 'Z')
+    self.assertIsNone(distribution.get(5))
+    self.assertIsNone(distribution.get('AC'))
+    self.assertIsNone(positions.get('\u20ac'))
+
+  def _run(self):
+    actions = (main.compute_character_distribution, main.compute_character_positions, self._probe)
+    return main._process_file(self.path, actions=actions)
+
+  def test_actions_get_every_sequence(self):
+    stats = self._run()
+    self.assertEqual(stats['sequences'], len(self.seen))
+    self.assertEqual([seen['seq'] for seen in self.seen],
+                     [b'ACGTNNACGT', b'ACGT', b'ACGTRY', b'MKV*', b'MKVLL*', b'ACGT.1', b'MK.', b'', b'ACGT'])
+    self.assertEqual(self.seen[0]['category_name'], 'DNA (ambiguous)')
+    self.assertEqual(self.seen[7]['category_name'], 'DNA (unambiguous)')
+    expected_keys = {'character_histogram', 'character_bits', 'type', 'type_flags', 'category_name',
+                     'character_distribution', 'character_positions'}
+    for seen in self.seen:
+      self.assertEqual(seen['keys'], expected_keys)
+
+  def test_character_distribution_and_positions(self):
+    self._run()
+    dna1 = self.seen[0]
+    self.assertEqual(dna1['distribution'], {'A': 2, 'C': 2, 'G': 2, 'N': 2, 'T': 2})
+    self.assertEqual(dna1['positions'], {'A': [0, 6], 'C': [1, 7], 'G': [2, 8], 'N': [4, 5], 'T': [3, 9]})
+    empty = self.seen[7]
+    self.assertEqual(empty['distribution'], {})
+    self.assertEqual(empty['positions'], {})
+
+  def test_membership(self):
+    def probe(seq, tmp, stats):
+      for mapping in (tmp['character_distribution'], tmp['character_positions']):
+        for c in ['A', 'C', 'G', 'T', 'N', 'Z', '*', '\x00', '\u20ac', 'AC', '', 65, None]:
+          self.assertEqual(c in mapping, isinstance(c, str) and c in set(seq.tobytes().decode()))
+      self.seen.append(seq)
+    main._process_file(self.path, actions=(main.compute_character_distribution, main.compute_character_positions, probe))
+    self.assertEqual(len(self.seen), 9)
+
+class CountTest(unittest.TestCase):
+
+  def test_count_adds_only_masked_characters(self):
+    stats = {'special_char_count': np.zeros((len(main._CATEGORIES), 256), dtype=np.int64)}
+    sequence_counts = np.zeros(256, dtype=np.int64)
+    sequence_counts[[ord('*'), ord('-'), ord('A')]] = [3, 1, 5]
+    mask = np.zeros(256, dtype=bool)
+    mask[[ord('*'), ord('-'), ord('X')]] = True
+    main._count(stats, 'special_char_count', 4, sequence_counts, mask)
+    main._count(stats, 'special_char_count', 4, sequence_counts, mask)
+    expected = np.zeros(256, dtype=np.int64)
+    expected[[ord('*'), ord('-')]] = [6, 2]
+    np.testing.assert_array_equal(stats['special_char_count'][4], expected)
+    self.assertFalse(np.delete(stats['special_char_count'], 4, axis=0).any())
+
+class LengthBucketTest(unittest.TestCase):
+
+  def test_lengths_are_in_their_bucket_range(self):
+    lengths = np.concatenate((np.arange(5000), [2**20, 2**40 + 1, 2**62]))
+    for length, bucket in zip(lengths.tolist(), main._length_buckets(lengths).tolist()):
+      lower, upper = main._length_bucket_range(bucket)
+      self.assertLessEqual(lower, length)
+      self.assertLess(length, upper)
+
+  def test_empty_sequences_have_their_own_bucket(self):
+    self.assertEqual(main._length_buckets(np.array([0, 1])).tolist(), [0, 1])
+    self.assertEqual(main._length_bucket_range(0), (0, 1))
+
+  def test_bucket_ranges_are_contiguous(self):
+    for bucket in range(1, 100):
+      self.assertEqual(main._length_bucket_range(bucket)[1], main._length_bucket_range(bucket + 1)[0])
+
+if __name__ == '__main__':
+  unittest.main()